@@ -1,5 +1,6 @@
 # app.py
 import os
+import threading
 from pathlib import Path
 import pandas as pd
 import numpy as np
@@ -17,6 +18,12 @@ st.set_page_config(
 DATA_DIR = Path("data")
 DATA_DIR.mkdir(exist_ok=True)
 
+DATA_FILES = ("literacy.csv", "enrollment.csv", "school_performance.csv")
+
+# How many heavy recomputations (data loads, national aggregates) may run at
+# the same time across all sessions of this server process.
+MAX_CONCURRENT_RECOMPUTES = int(os.environ.get("DASHBOARD_MAX_RECOMPUTES", "2"))
+
 # --------- Helpers to load or create sample data ----------
 def generate_sample_literacy():
     years = list(range(2008, 2025))
@@ -59,18 +66,20 @@ def generate_sample_school_perf():
                          "pass_rate": passr, "num_students": students})
     return pd.DataFrame(rows)
 
-@st.cache_data
 def load_or_create_data():
     # Try to load literacy.csv
     literacy_path = DATA_DIR / "literacy.csv"
     enrollment_path = DATA_DIR / "enrollment.csv"
     perf_path = DATA_DIR / "school_performance.csv"
+    # file name -> parse error, for files replaced by generated sample data;
+    # the caller shows these so every session sees them
+    load_errors = {}
 
     if literacy_path.exists():
         try:
             literacy = pd.read_csv(literacy_path)
         except Exception as e:
-            st.warning(f"Error reading {literacy_path}: {e}. Using generated sample literacy data.")
+            load_errors[literacy_path.name] = str(e)
             literacy = generate_sample_literacy()
     else:
         literacy = generate_sample_literacy()
@@ -80,7 +89,7 @@ def load_or_create_data():
         try:
             enrollment = pd.read_csv(enrollment_path)
         except Exception as e:
-            st.warning(f"Error reading {enrollment_path}: {e}. Using generated sample enrollment data.")
+            load_errors[enrollment_path.name] = str(e)
             enrollment = generate_sample_enrollment()
     else:
         enrollment = generate_sample_enrollment()
@@ -90,7 +99,7 @@ def load_or_create_data():
         try:
             perf = pd.read_csv(perf_path)
         except Exception as e:
-            st.warning(f"Error reading {perf_path}: {e}. Using generated sample school performance data.")
+            load_errors[perf_path.name] = str(e)
             perf = generate_sample_school_perf()
     else:
         perf = generate_sample_school_perf()
@@ -101,10 +110,282 @@ def load_or_create_data():
     enrollment.columns = [c.strip().lower() for c in enrollment.columns]
     perf.columns = [c.strip().lower() for c in perf.columns]
 
-    return literacy, enrollment, perf
+    return literacy, enrollment, perf, load_errors
+
+# --------- Data quality validation ----------
+REQUIRED_COLUMNS = {
+    "literacy": ["year", "province", "male_literacy", "female_literacy", "overall_literacy"],
+    "enrollment": ["year", "province", "level", "enrollment"],
+    "school_performance": ["year", "district", "province", "avg_score", "pass_rate", "num_students"],
+}
+
+# Columns that identify one row; a district may appear only once per year
+KEY_COLUMNS = {
+    "literacy": ["year", "province"],
+    "enrollment": ["year", "province", "level"],
+    "school_performance": ["year", "district"],
+}
+
+# (min, max) allowed for numeric columns; None means unbounded
+VALUE_RANGES = {
+    "literacy": {"male_literacy": (0, 100), "female_literacy": (0, 100), "overall_literacy": (0, 100)},
+    "enrollment": {"enrollment": (0, None)},
+    "school_performance": {"avg_score": (0, 100), "pass_rate": (0, 1), "num_students": (0, None)},
+}
+
+# Years outside this range are reported as errors and left out of the gap checks
+YEAR_RANGE = (1947, 2100)
+
+# Longest list of values (missing years, unknown provinces) written into one report entry
+MAX_LISTED_VALUES = 10
+
+def list_values(values):
+    values = [str(v) for v in values]
+    listed = ", ".join(values[:MAX_LISTED_VALUES])
+    if len(values) > MAX_LISTED_VALUES:
+        listed += f" and {len(values) - MAX_LISTED_VALUES} more"
+    return listed
+
+def combine_codes(*factorized):
+    """Merge factorized columns into one integer key per row.
+
+    Takes ``(codes, uniques)`` pairs as returned by ``pd.factorize`` and
+    returns the keys of the rows where every column has a value.
+    """
+    complete = np.ones(len(factorized[0][0]), dtype=bool)
+    key = np.zeros(len(factorized[0][0]), dtype=np.int64)
+    for codes, uniques in factorized:
+        complete &= codes >= 0
+        key = key * len(uniques) + codes
+    return key[complete]
+
+def validate_datasets(datasets, load_errors):
+    """Run rule checks over all datasets and return a compact report.
+
+    ``datasets`` maps a dataset name to its DataFrame. Each column is read
+    once: numeric columns are converted with ``pd.to_numeric`` and key
+    columns are factorized, and the uniqueness, gap, consistency and
+    referential checks all work on those integer codes. The report holds one
+    entry per failed check, never the offending rows themselves.
+    """
+    issues = []
+    factorized = {}
+
+    def add_issue(dataset, check, severity, count, detail):
+        # count is the number of failing rows, columns, years or districts
+        if count:
+            issues.append({"dataset": dataset, "check": check, "severity": severity,
+                           "count": int(count), "detail": detail})
+
+    for file_name, error in load_errors.items():
+        add_issue(Path(file_name).stem, "parse", "error", 1,
+                  f"{file_name} could not be read ({error}); generated sample data is shown instead")
+
+    for name, df in datasets.items():
+        missing_cols = [c for c in REQUIRED_COLUMNS[name] if c not in df.columns]
+        add_issue(name, "schema", "error", len(missing_cols),
+                  f"missing columns: {', '.join(missing_cols)}")
+
+        for col, (lo, hi) in VALUE_RANGES[name].items():
+            if col not in df.columns:
+                continue
+            values = pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=float)
+            is_nan = np.isnan(values)
+            out_of_range = np.zeros(len(values), dtype=bool)
+            if lo is not None:
+                out_of_range |= values < lo
+            if hi is not None:
+                out_of_range |= values > hi
+            bounds = f"outside [{lo}, {hi}]" if hi is not None else f"below {lo}"
+            add_issue(name, "range", "error", out_of_range.sum(), f"{col} {bounds}")
+            add_issue(name, "missing values", "warning", is_nan.sum(), f"{col} is empty or not numeric")
+
+        codes = factorized[name] = {}
+        if "year" in df.columns:
+            years = pd.to_numeric(df["year"], errors="coerce").to_numpy(dtype=float)
+            # Empty or non-numeric years are counted by the key check below
+            bad_year = ~np.isnan(years) & (
+                (years < YEAR_RANGE[0]) | (years > YEAR_RANGE[1]) | (years != np.floor(years))
+            )
+            add_issue(name, "range", "error", bad_year.sum(),
+                      f"year outside {YEAR_RANGE[0]}–{YEAR_RANGE[1]} or not a whole number")
+            # np.where builds a new array; the input frame is shared and must not change
+            codes["year"] = pd.factorize(np.where(bad_year, np.nan, years))
+        for col in KEY_COLUMNS[name] + ["province"]:
+            if col in df.columns and col not in codes:
+                codes[col] = pd.factorize(df[col])
+
+        keys = KEY_COLUMNS[name]
+        if all(c in codes for c in keys):
+            complete_keys = combine_codes(*(codes[c] for c in keys))
+            add_issue(name, "missing values", "error", len(df) - len(complete_keys),
+                      f"empty or invalid key column ({', '.join(keys)})")
+            add_issue(name, "uniqueness", "error", len(complete_keys) - len(pd.unique(complete_keys)),
+                      f"duplicate rows for ({', '.join(keys)})")
+
+        if "year" in codes:
+            year_values = codes["year"][1].astype(int)
+            if len(year_values):
+                gaps = np.setdiff1d(np.arange(year_values.min(), year_values.max() + 1), year_values)
+                add_issue(name, "missing years", "warning", len(gaps), f"no rows for {list_values(gaps)}")
+            if "province" in codes:
+                num_years = len(year_values)
+                pairs = pd.unique(combine_codes(codes["province"], codes["year"]))
+                expected = 0
+                if len(pairs):
+                    expected = len(pd.unique(pairs // num_years)) * len(pd.unique(pairs % num_years))
+                add_issue(name, "missing years", "warning", expected - len(pairs),
+                          "province/year combinations with no rows")
+
+    perf_codes = factorized["school_performance"]
+    if "district" in perf_codes and "province" in perf_codes:
+        num_provinces = len(perf_codes["province"][1])
+        district_provinces = pd.unique(combine_codes(perf_codes["district"], perf_codes["province"]))
+        provinces_per_district = np.bincount(district_provinces // max(num_provinces, 1))
+        add_issue("school_performance", "consistency", "error", (provinces_per_district > 1).sum(),
+                  "districts assigned to more than one province")
+
+    if "province" in factorized["literacy"]:
+        known_provinces = factorized["literacy"]["province"][1].astype(str)
+        for name in ("enrollment", "school_performance"):
+            if "province" not in factorized[name]:
+                continue
+            unknown = np.setdiff1d(factorized[name]["province"][1].astype(str), known_provinces)
+            add_issue(name, "referential", "warning", len(unknown),
+                      f"provinces not in literacy data: {list_values(unknown)}")
+
+    return {
+        "rows_checked": {name: len(df) for name, df in datasets.items()},
+        "errors": sum(1 for i in issues if i["severity"] == "error"),
+        "warnings": sum(1 for i in issues if i["severity"] == "warning"),
+        "issues": issues,
+    }
+
+# --------- Cross-session coordination for heavy recomputation ----------
+def get_data_version():
+    """Fingerprint of the data files; changes whenever any of them is rewritten."""
+    version = []
+    for name in DATA_FILES:
+        path = DATA_DIR / name
+        try:
+            stat = path.stat()
+            version.append((name, stat.st_mtime_ns, stat.st_size))
+        except FileNotFoundError:
+            version.append((name, None, None))
+    return tuple(version)
+
+@st.cache_resource
+def get_recompute_coordinator():
+    # Shared by every session in this process (st.cache_resource is a singleton)
+    return {
+        "lock": threading.Lock(),
+        "slots": threading.BoundedSemaphore(max(1, MAX_CONCURRENT_RECOMPUTES)),
+        "versions": {},   # version -> order first seen (higher is newer)
+        "inflight": {},   # (name, version) -> {"done", "ok", "result"}
+        "last_good": {},  # name -> (version, result), newest version only
+        "failed": {},     # (name, version) -> error message, kept until a newer version appears
+    }
 
-# Load data
-literacy_df, enrollment_df, perf_df = load_or_create_data()
+def run_coalesced(name, version, compute, allow_stale=False):
+    """Run ``compute`` once per (name, version) no matter how many sessions ask.
+
+    The first session to ask becomes the leader and computes the value while
+    holding one of the shared recompute slots. Other sessions asking for the
+    same key wait for the leader to finish instead of starting a duplicate
+    run. With ``allow_stale=True`` they get the last good result for ``name``
+    instead, as long as it is for an older version, and a failed refresh keeps
+    serving it. A failed compute is not retried until the data changes.
+    Returns ``(version, result)`` so callers know which version they were served.
+    """
+    coord = get_recompute_coordinator()
+    key = (name, version)
+    while True:
+        with coord["lock"]:
+            versions = coord["versions"]
+            if version not in versions:
+                versions[version] = len(versions)
+                # A new data version gets a fresh chance at everything that failed
+                coord["failed"].clear()
+            last = coord["last_good"].get(name)
+            if last is not None and last[0] == version:
+                return last
+            # Never hand a session a result computed from newer data than its own
+            if not allow_stale or (last is not None and versions[last[0]] > versions[version]):
+                last = None
+            if key in coord["failed"]:
+                if last is not None:
+                    return last
+                # A new exception each time, so cached failures don't pile up tracebacks
+                raise RuntimeError(f"Computing {name} failed: {coord['failed'][key]}")
+            flight = coord["inflight"].get(key)
+            is_leader = flight is None
+            if is_leader:
+                flight = {"done": threading.Event(), "ok": False, "result": None}
+                coord["inflight"][key] = flight
+
+        if is_leader:
+            break
+        if last is not None:
+            return last
+        flight["done"].wait()
+        if flight["ok"]:
+            return version, flight["result"]
+        # The leader failed (recorded in "failed") or was interrupted by a
+        # rerun/stop; go round again to report the failure or take over.
+
+    try:
+        with coord["slots"]:
+            result = compute()
+    except Exception as e:
+        with coord["lock"]:
+            coord["failed"][key] = f"{type(e).__name__}: {e}"
+        if last is None:
+            raise
+        st.warning(f"Refreshing {name} failed: {e}. Showing the last good data.")
+        return last
+    else:
+        flight["result"] = result
+        flight["ok"] = True
+        with coord["lock"]:
+            versions = coord["versions"]
+            current = coord["last_good"].get(name)
+            if current is None or versions[current[0]] < versions[version]:
+                coord["last_good"][name] = (version, result)
+        return version, result
+    finally:
+        # Runs for BaseException too (Streamlit's RerunException/StopException),
+        # so waiting sessions are always released
+        with coord["lock"]:
+            coord["inflight"].pop(key, None)
+        flight["done"].set()
+
+def has_last_good(name):
+    return name in get_recompute_coordinator()["last_good"]
+
+def load_datasets():
+    datasets = load_or_create_data()
+    # Generated sample data is only a stand-in on a cold start; during a
+    # refresh an unreadable file fails the refresh so the last good data stays
+    if datasets[3] and has_last_good("datasets"):
+        raise ValueError(f"could not read {', '.join(datasets[3])}")
+    return datasets
+
+# Load data (one load per data version, shared by all sessions). While a new
+# version is loading, other sessions keep rendering the previous one, so derived
+# aggregates are keyed on the version actually served, not the one on disk.
+data_version, datasets = run_coalesced("datasets", get_data_version(), load_datasets, allow_stale=True)
+literacy_df, enrollment_df, perf_df = (df.copy() for df in datasets[:3])
+for file_name, error in datasets[3].items():
+    st.warning(f"Error reading {DATA_DIR / file_name}: {error}. Using generated sample data.")
+
+# Validate once per data version; every session reuses the same report
+_, quality_report = run_coalesced(
+    "data_quality", data_version,
+    lambda: validate_datasets(
+        {"literacy": datasets[0], "enrollment": datasets[1], "school_performance": datasets[2]},
+        datasets[3],
+    )
+)
 
 # --------- Custom CSS for better styling ----------
 st.markdown("""
@@ -195,6 +476,21 @@ st.markdown("""
 </div>
 """, unsafe_allow_html=True)
 
+# Data health panel (report is computed once per data version)
+if quality_report["errors"]:
+    health_label = f"🩺 Data Health — {quality_report['errors']} error(s), {quality_report['warnings']} warning(s)"
+elif quality_report["warnings"]:
+    health_label = f"🩺 Data Health — {quality_report['warnings']} warning(s)"
+else:
+    health_label = "🩺 Data Health — all checks passed"
+with st.expander(health_label, expanded=quality_report["errors"] > 0):
+    rows_checked = quality_report["rows_checked"]
+    st.caption(" · ".join(f"{name}: {count:,} rows checked" for name, count in rows_checked.items()))
+    if quality_report["issues"]:
+        st.dataframe(pd.DataFrame(quality_report["issues"]), use_container_width=True, hide_index=True)
+    else:
+        st.success("✅ No data quality issues found.")
+
 # Row: literacy trend + gender gap
 st.markdown("## 📊 Literacy Analysis")
 col1, col2 = st.columns([2,1])
@@ -202,12 +498,13 @@ col1, col2 = st.columns([2,1])
 with col1:
     st.markdown("### 📈 National Literacy Trend")
     # compute national mean per year if overall_literacy present else compute average of male/female
-    if 'overall_literacy' in literacy_df.columns:
-        trend = literacy_df.groupby('year')['overall_literacy'].mean().reset_index()
-    else:
+    if 'overall_literacy' not in literacy_df.columns:
         # fallback
         literacy_df['overall_literacy'] = (literacy_df.get('male_literacy',0) + literacy_df.get('female_literacy',0)) / 2
-        trend = literacy_df.groupby('year')['overall_literacy'].mean().reset_index()
+    _, trend = run_coalesced(
+        "literacy_trend", data_version,
+        lambda: literacy_df.groupby('year')['overall_literacy'].mean().reset_index()
+    )
 
     fig_trend = px.line(trend, x='year', y='overall_literacy', markers=True,
                         title="Mean Overall Literacy Rate (National Average)")
@@ -248,7 +545,10 @@ with col2:
     st.markdown("### 👫 Gender Gap Analysis")
     if 'male_literacy' in literacy_df.columns and 'female_literacy' in literacy_df.columns:
         # show area chart for male vs female over time (national average)
-        gg = literacy_df.groupby('year')[['male_literacy', 'female_literacy']].mean().reset_index()
+        _, gg = run_coalesced(
+            "gender_trend", data_version,
+            lambda: literacy_df.groupby('year')[['male_literacy', 'female_literacy']].mean().reset_index()
+        )
         fig_gap = go.Figure()
         fig_gap.add_trace(go.Scatter(
             x=gg['year'], y=gg['male_literacy'], 